@@ -0,0 +1,133 @@
+"""Compare a --geometry_only dataset against a Cycles dataset of the same poses.
+
+Render both with identical sampling arguments and --seed (the pose draws are
+the same), then run:
+
+  blender --background --python check_geometry_parity.py -- \
+    results/doll_render_output_A results/doll_render_output_B
+
+Per view (each rig camera of a --rig dataset counts as a view) it reports
+foreground IoU, relative depth error and normal angle error on pixels both
+renders cover, and checks that both datasets use the same pass file names.
+Exits with status 1 if any view is outside the tolerances (see --help) or
+exists in only one of the datasets.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from multi_view_renderer import BACKGROUND_DEPTH, find_pass_file, load_image_array
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    p = argparse.ArgumentParser(description='Geometry-only vs Cycles parity check')
+    p.add_argument('cycles_dataset')
+    p.add_argument('geometry_dataset')
+    p.add_argument('--min_iou', type=float, default=0.98,
+                   help='Minimum foreground IoU per view')
+    p.add_argument('--max_depth_rel_err', type=float, default=1e-3,
+                   help='Maximum median |depth error| / depth per view')
+    p.add_argument('--max_normal_deg', type=float, default=1.0,
+                   help='Maximum median normal angle error (degrees) per view')
+    return p.parse_args(argv)
+
+
+def interior(mask):
+    """Drop pixels next to a silhouette, where Cycles filters over sub-pixels."""
+    m = mask.copy()
+    m[1:, :] &= mask[:-1, :]
+    m[:-1, :] &= mask[1:, :]
+    m[:, 1:] &= mask[:, :-1]
+    m[:, :-1] &= mask[:, 1:]
+    return m
+
+
+def compare_view(ref_dir, test_dir, args):
+    """Returns (stats dict, list of failure strings) for one view folder."""
+    failures = []
+    ref_path, test_path = find_pass_file(ref_dir, 'Depth'), find_pass_file(test_dir, 'Depth')
+    if not (ref_path and test_path):
+        return None, [f'missing Depth pass ({ref_path}, {test_path})']
+    if os.path.basename(ref_path) != os.path.basename(test_path):
+        failures.append(f'file name {os.path.basename(test_path)} != {os.path.basename(ref_path)}')
+
+    ref_d = load_image_array(ref_path, non_color=True)[..., 0]
+    test_d = load_image_array(test_path, non_color=True)[..., 0]
+    ref_fg, test_fg = ref_d < BACKGROUND_DEPTH * 0.5, test_d < BACKGROUND_DEPTH * 0.5
+    iou = (ref_fg & test_fg).sum() / max((ref_fg | test_fg).sum(), 1)
+    core = interior(ref_fg & test_fg)
+    rel = np.abs(ref_d[core] - test_d[core]) / ref_d[core]
+    stats = {'iou': iou, 'depth_rel_err': float(np.median(rel)) if rel.size else 0.0}
+    if iou < args.min_iou:
+        failures.append(f'IoU {iou:.4f} < {args.min_iou}')
+    if stats['depth_rel_err'] > args.max_depth_rel_err:
+        failures.append(f'depth rel err {stats["depth_rel_err"]:.2e} > {args.max_depth_rel_err}')
+
+    ref_n, test_n = find_pass_file(ref_dir, 'Normal'), find_pass_file(test_dir, 'Normal')
+    if ref_n and test_n:
+        a = load_image_array(ref_n, non_color=True)[..., :3][core]
+        b = load_image_array(test_n, non_color=True)[..., :3][core]
+        cos = np.sum(a * b, axis=1) / np.maximum(np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1), 1e-12)
+        ang = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+        stats['normal_deg'] = float(np.median(ang)) if ang.size else 0.0
+        if stats['normal_deg'] > args.max_normal_deg:
+            failures.append(f'normal error {stats["normal_deg"]:.2f} deg > {args.max_normal_deg}')
+    return stats, failures
+
+
+def view_dirs(root):
+    """Relative paths of view folders (those holding camera_info.json): 00001,
+    or 00001/<camera> for rig datasets. Level subfolders have no camera_info."""
+    found = []
+    for dirpath, _, files in os.walk(root):
+        if 'camera_info.json' in files:
+            found.append(os.path.relpath(dirpath, root))
+    return sorted(found)
+
+
+def main():
+    args = parse_args()
+    ref_views = view_dirs(args.cycles_dataset)
+    test_views = view_dirs(args.geometry_dataset)
+    if not ref_views:
+        sys.exit(f'No views (folders with camera_info.json) in {args.cycles_dataset}')
+    views = sorted(set(ref_views) | set(test_views))
+    all_stats, failed = [], 0
+    for view in views:
+        if view not in test_views:
+            stats, failures = None, ['missing from the geometry dataset']
+        elif view not in ref_views:
+            stats, failures = None, ['missing from the Cycles dataset']
+        else:
+            stats, failures = compare_view(os.path.join(args.cycles_dataset, view),
+                                           os.path.join(args.geometry_dataset, view), args)
+        if stats:
+            all_stats.append(stats)
+            line = f'{view}: IoU {stats["iou"]:.4f}  depth rel err {stats["depth_rel_err"]:.2e}'
+            if 'normal_deg' in stats:
+                line += f'  normal {stats["normal_deg"]:.3f} deg'
+        else:
+            line = f'{view}:'
+        if failures:
+            failed += 1
+            line += '  FAIL: ' + '; '.join(failures)
+        print(line)
+
+    if all_stats:
+        print(f'\n{len(all_stats)} views: mean IoU {np.mean([s["iou"] for s in all_stats]):.4f}, '
+              f'worst depth rel err {max(s["depth_rel_err"] for s in all_stats):.2e}'
+              + (f', worst normal {max(s["normal_deg"] for s in all_stats):.3f} deg'
+                 if all('normal_deg' in s for s in all_stats) else ''))
+    if failed:
+        print(f'{failed}/{len(views)} views outside tolerance or missing')
+        sys.exit(1)
+    print('PASS')
+
+
+if __name__ == '__main__':
+    main()
@@ -13,25 +13,51 @@ Usage (example):
     --roll_min -15 --roll_max 15 \
     --resolution 640 480 \
     --engine cycles --samples 64 \
-    --depth_pass --normal_pass --seed 123
+    --depth_pass --normal_pass --seed 123 \
+    --extra_resolutions 320 240 160 120
+
+Coverage planning (--plan coverage --coverage_target 0.95) greedily picks the
+next view that sees the most not-yet-seen surface, stopping at the target
+coverage or after --views renders.
+
+Geometry-only mode (--geometry_only) skips Cycles and rasterizes
+Depth0001.exr, Normal0001.exr and Mask0001.png (the compositor's names) on the
+CPU with a z-buffer (numba when installed, else NumPy; no color).
+
+Startup: light, camera, render settings and compositor graph are cached in a
+template .blend under --template_dir (keyed by engine, passes, Blender
+version and the setup functions' source) and later runs open it and only
+patch resolution/samples/lens.
+Startup time is printed and stored in metadata.json (--no_template to compare).
+
+Rig mode (--rig rigs/stereo_side_rig.json) renders every rig camera for each
+sampled pose in one multiview render; outputs go to 00001/<camera_name>/.
 
 Outputs a folder: {object_name}_render_output_YYYYmmdd_HHMMSS/
   metadata.json (global scene & config info)
   00001/
     camera_info.json
     rendered_image.png
-    Image.exr (Cycles full output - via compositor file output)
-    Depth.exr (if depth_pass)
-    Normal.exr (if normal_pass)
+    Image0001.exr (Cycles full output - via compositor file output, frame-suffixed)
+    Depth0001.exr (if depth_pass)
+    Normal0001.exr (if normal_pass)
+    Mask0001.png (if mask_pass; uint8/uint16 object index, IDs in metadata.json 'mask_ids')
+    320x240/ (one folder per --extra_resolutions level, downsampled from the render)
+      rendered_image.png, Image.exr, Depth.exr, Normal.exr, Mask.png
 """
 
 import bpy
+import glob
+import hashlib
+import inspect
 import math
 import mathutils
+import numpy as np
 import os
 import sys
 import json
 import random
+import time
 from datetime import datetime
 
 # ---------------------------- Argument Parsing ---------------------------- #
@@ -62,14 +88,56 @@ def parse_args():
     p.add_argument('--seed', type=int, default=0)
     p.add_argument('--depth_pass', action='store_true')
     p.add_argument('--normal_pass', action='store_true')
+    p.add_argument('--mask_pass', action='store_true',
+                   help='Object index mask as uint8/uint16 PNG (Mask0001.png) with per-view pixel counts '
+                        '(Cycles or --geometry_only)')
     p.add_argument('--focal_length', type=float, default=50.0, help='Camera focal length (mm)')
     p.add_argument('--sensor_width', type=float, default=36.0)
     p.add_argument('--sensor_height', type=float, default=24.0)
+    p.add_argument('--extra_resolutions', type=int, nargs='+', default=[],
+                   help='Additional W H pairs (each <= --resolution) written by downsampling the single render')
+    p.add_argument('--depth_downsample', choices=['min','nearest'], default='min',
+                   help='Source pixel per --extra_resolutions footprint for depth, normals and mask')
+    p.add_argument('--rig', type=str, default=None,
+                   help='JSON camera rig (relative extrinsics + per-camera intrinsics) attached to each sampled pose')
+    p.add_argument('--geometry_only', action='store_true',
+                   help='Skip path tracing; rasterize depth/normal/mask passes with a NumPy z-buffer')
+    p.add_argument('--plan', choices=['random','coverage'], default='random',
+                   help='random: independent samples; coverage: greedy next-best-view on surface coverage')
+    p.add_argument('--coverage_target', type=float, default=0.95,
+                   help='Stop coverage planning once this fraction of surface samples is seen')
+    p.add_argument('--plan_candidates', type=int, default=256,
+                   help='Candidate poses sampled from the distance/elev/azim/roll ranges for coverage planning')
+    p.add_argument('--surface_samples', type=int, default=4000,
+                   help='Area-weighted surface points used to measure coverage')
+    p.add_argument('--plan_resolution', type=int, default=160,
+                   help='Longest side (pixels) of the depth buffers used for planning visibility')
     p.add_argument('--jitter_target', type=float, default=0.0, help='Random jitter (meters) added to look target')
+    p.add_argument('--template_dir', type=str, default='.template_cache',
+                   help='Directory of cached startup scene templates (.blend)')
+    p.add_argument('--no_template', action='store_true',
+                   help='Always build the startup scene from factory settings')
     # Default output root changed to 'results' directory (auto-created) so datasets
     # no longer clutter repo root. User can still override with --output_root.
     p.add_argument('--output_root', type=str, default='results')
     args = p.parse_args(argv)
+    if len(args.extra_resolutions) % 2 != 0:
+        p.error('--extra_resolutions expects W H pairs')
+    levels = [tuple(args.extra_resolutions[i:i+2]) for i in range(0, len(args.extra_resolutions), 2)]
+    for (w, h) in levels:
+        if w <= 0 or h <= 0 or w > args.resolution[0] or h > args.resolution[1]:
+            p.error(f'--extra_resolutions {w} {h} must be positive and not exceed --resolution')
+    args.extra_resolutions = levels
+    if args.mask_pass and args.engine != 'cycles' and not args.geometry_only:
+        p.error('--mask_pass needs the object index pass, which requires --engine cycles')
+    if args.plan_candidates < 1:
+        p.error('--plan_candidates must be at least 1')
+    if args.surface_samples < 1:
+        p.error('--surface_samples must be at least 1')
+    if args.plan_resolution < 1:
+        p.error('--plan_resolution must be at least 1')
+    if not 0.0 < args.coverage_target <= 1.0:
+        p.error('--coverage_target must be in (0, 1]')
     return args
 
 # ---------------------------- Utility Functions --------------------------- #
@@ -245,6 +313,100 @@ def setup_camera(focal_length, sensor_w, sensor_h):
     return cam
 
 
+def load_rig(path, args):
+    """Read a rig JSON file.
+
+    Format: {"cameras": [{"name": "left", "location": [x, y, z],
+    "rotation_euler_deg": [rx, ry, rz], "focal_length": mm,
+    "sensor_width": mm, "sensor_height": mm}, ...]}. Location/rotation are
+    relative to the sampled pose (camera convention: -Z forward, Y up);
+    missing intrinsics fall back to the CLI values. The first camera is the
+    reference for baselines. All cameras share --resolution.
+    """
+    with open(path) as f:
+        spec = json.load(f)
+    cams = spec.get('cameras', [])
+    if not cams:
+        raise ValueError(f'Rig {path} defines no cameras')
+    names = [c.get('name') for c in cams]
+    if None in names or len(set(names)) != len(names):
+        raise ValueError(f'Rig {path}: every camera needs a unique name')
+    rig = []
+    for c in cams:
+        rig.append({
+            'name': c['name'],
+            'location': list(c.get('location', [0.0, 0.0, 0.0])),
+            'rotation_euler_deg': list(c.get('rotation_euler_deg', [0.0, 0.0, 0.0])),
+            'focal_length': c.get('focal_length', args.focal_length),
+            'sensor_width': c.get('sensor_width', args.sensor_width),
+            'sensor_height': c.get('sensor_height', args.sensor_height),
+        })
+    return rig
+
+
+def setup_rig(rig):
+    """Create an empty rig root with one child camera per rig entry and enable
+    multiview so a single render call covers every camera. Sampling,
+    denoising and compositing still run once per camera.
+    Returns (root, [(spec, camera, suffix), ...])."""
+    scene = bpy.context.scene
+    root = bpy.data.objects.new('RigRoot', None)
+    scene.collection.objects.link(root)
+
+    scene.render.use_multiview = True
+    scene.render.views_format = 'MULTIVIEW'
+    scene.render.image_settings.views_format = 'INDIVIDUAL'
+    for v in scene.render.views:
+        v.use = False
+
+    cams = []
+    for spec in rig:
+        suffix = f'_{spec["name"]}'
+        cam = setup_camera(spec['focal_length'], spec['sensor_width'], spec['sensor_height'])
+        # Multiview resolves each view's camera as <prefix><view suffix>.
+        cam.name = f'RigCam{suffix}'
+        cam.parent = root
+        cam.location = spec['location']
+        cam.rotation_euler = [math.radians(a) for a in spec['rotation_euler_deg']]
+        view = scene.render.views.get(spec['name']) or scene.render.views.new(spec['name'])
+        view.camera_suffix = suffix
+        view.use = True
+        cams.append((spec, cam, suffix))
+    scene.camera = cams[0][1]
+    return root, cams
+
+
+def split_multiview_outputs(view_dir, rig_cams):
+    """Move `<stem>[frame]<suffix>.<ext>` files written by a multiview render
+    into `view_dir/<camera_name>/<stem>[frame].<ext>`."""
+    by_suffix = sorted(((suffix, spec['name']) for spec, _, suffix in rig_cams),
+                       key=lambda t: len(t[0]), reverse=True)
+    for name in os.listdir(view_dir):
+        path = os.path.join(view_dir, name)
+        if not os.path.isfile(path):
+            continue
+        stem, ext = os.path.splitext(name)
+        for suffix, cam_name in by_suffix:
+            if stem.endswith(suffix):
+                cam_dir = os.path.join(view_dir, cam_name)
+                os.makedirs(cam_dir, exist_ok=True)
+                os.replace(path, os.path.join(cam_dir, stem[:-len(suffix)] + ext))
+                break
+
+
+def rig_baseline_dict(spec, rig):
+    ref = rig[0]
+    rel = [spec['location'][i] - ref['location'][i] for i in range(3)]
+    return {
+        'name': spec['name'],
+        'reference_camera': ref['name'],
+        'relative_location': spec['location'],
+        'relative_rotation_euler_deg': spec['rotation_euler_deg'],
+        'baseline_vector_m': rel,
+        'baseline_m': math.sqrt(sum(c*c for c in rel)),
+    }
+
+
 def look_at(cam, target, roll_deg=0.0):
     direction = (target - cam.location).normalized()
     # Build a rotation matrix where -Z is forward for camera, Y is up.
@@ -280,6 +442,25 @@ def spherical_sample(dist, azim_deg, elev_deg):
     return mathutils.Vector((x, y, z))
 
 
+def sample_pose(args):
+    """Random pose from the CLI ranges (same draw order as the original loop)."""
+    dist = random.uniform(args.distance_min, args.distance_max)
+    elev = random.uniform(args.elev_min, args.elev_max)
+    azim = random.uniform(args.azim_min, args.azim_max)
+    roll = random.uniform(args.roll_min, args.roll_max)
+    target = mathutils.Vector((0,0,0))
+    if args.jitter_target > 0:
+        jt = args.jitter_target
+        target += mathutils.Vector((random.uniform(-jt,jt), random.uniform(-jt,jt), random.uniform(-jt,jt)))
+    return {
+        'distance': dist,
+        'azimuth_deg': azim,
+        'elevation_deg': elev,
+        'roll_deg': roll,
+        'target': target,
+    }
+
+
 def compute_object_stats(obj):
     mesh = obj.data
     verts = len(mesh.vertices)
@@ -300,6 +481,24 @@ def compute_object_stats(obj):
     }
 
 
+def assign_mask_ids(scene):
+    """Give every mesh object a unique `pass_index` (0 is background).
+
+    Returns the ID -> object name table stored in metadata.json.
+    """
+    ids = {0: 'background'}
+    meshes = sorted((o for o in scene.objects if o.type == 'MESH'), key=lambda o: o.name)
+    for i, o in enumerate(meshes, start=1):
+        o.pass_index = i
+        ids[i] = o.name
+    return ids
+
+
+def mask_max_value(mask_ids):
+    """Integer range of the mask PNG: uint8 when IDs fit, otherwise uint16."""
+    return 255 if max(mask_ids) <= 255 else 65535
+
+
 def ensure_output_dir(root, object_name):
     ts = datetime.now().strftime('%Y%m%d_%H%M%S')
     out_dir = os.path.join(root, f'{object_name}_render_output_{ts}')
@@ -307,7 +506,7 @@ def ensure_output_dir(root, object_name):
     return out_dir
 
 
-def configure_render(engine, res_x, res_y, samples, use_depth, use_normal):
+def configure_render(engine, res_x, res_y, samples, use_depth, use_normal, mask_max=None):
     scene = bpy.context.scene
     scene.render.image_settings.file_format = 'PNG'
     scene.render.resolution_x = res_x
@@ -318,6 +517,8 @@ def configure_render(engine, res_x, res_y, samples, use_depth, use_normal):
         scene.cycles.samples = samples
         scene.cycles.progressive = 'PATH'
         scene.cycles.use_adaptive_sampling = True
+        # Keep synced geometry and BVH between renders; only cameras move.
+        scene.render.use_persistent_data = True
     else:
         scene.render.engine = 'BLENDER_EEVEE_NEXT'
         scene.eevee.taa_render_samples = samples
@@ -330,6 +531,9 @@ def configure_render(engine, res_x, res_y, samples, use_depth, use_normal):
     file_out = tree.nodes.new('CompositorNodeOutputFile')
     file_out.label = 'Dataset File Output'
     file_out.base_path = ''
+    # Passes are float data: write OpenEXR, not the node's default 8-bit PNG.
+    file_out.format.file_format = 'OPEN_EXR'
+    file_out.format.color_depth = '32'
 
     view_layer = scene.view_layers[0]
 
@@ -355,6 +559,27 @@ def configure_render(engine, res_x, res_y, samples, use_depth, use_normal):
             except Exception:
                 pass
 
+    if mask_max is not None:
+        view_layer.use_pass_object_index = True
+        # scene.render.dither_intensity is left alone: the File Output mask
+        # slot (Raw override) is written without dither, so IDs stay exact
+        # and rendered_image.png keeps the scene's dithering.
+        if 'Mask' not in file_out.inputs:
+            before = len(file_out.file_slots)
+            file_out.file_slots.new('Mask')
+            try:
+                slot = file_out.file_slots[before]
+                slot.path = 'Mask'
+                # Integer IDs, not a float EXR: BW PNG, no view transform.
+                slot.use_node_format = False
+                slot.format.file_format = 'PNG'
+                slot.format.color_mode = 'BW'
+                slot.format.color_depth = '8' if mask_max == 255 else '16'
+                slot.format.color_management = 'OVERRIDE'
+                slot.format.view_settings.view_transform = 'Raw'
+            except Exception:
+                pass
+
     links = tree.links
     def safe_link(out_name, in_name):
         if out_name in rl.outputs and in_name in file_out.inputs:
@@ -368,11 +593,108 @@ def configure_render(engine, res_x, res_y, samples, use_depth, use_normal):
         safe_link('Depth', 'Depth')
     if use_normal:
         safe_link('Normal', 'Normal')
+    if mask_max is not None and 'IndexOB' in rl.outputs and 'Mask' in file_out.inputs:
+        # PNG stores [0, 1]; scale so pass_index k lands on integer code k.
+        scale = tree.nodes.new('CompositorNodeMath')
+        scale.operation = 'DIVIDE'
+        scale.inputs[1].default_value = float(mask_max)
+        links.new(rl.outputs['IndexOB'], scale.inputs[0])
+        links.new(scale.outputs[0], file_out.inputs['Mask'])
 
     return file_out
 
 
-def camera_intrinsics_dict(cam, scene):
+def update_mask_range(scene, file_out, mask_max):
+    """Switch a prebuilt mask output between uint8 and uint16 once the ID count is known."""
+    for slot in file_out.file_slots:
+        if slot.path == 'Mask':
+            slot.format.color_depth = '8' if mask_max == 255 else '16'
+    for node in scene.node_tree.nodes:
+        if node.type == 'MATH' and node.operation == 'DIVIDE':
+            node.inputs[1].default_value = float(mask_max)
+
+
+# ---------------------------- Startup Template ---------------------------- #
+
+# Bump when the template format itself changes (load_template / patch_template).
+TEMPLATE_VERSION = 1
+
+
+def template_source_hash():
+    """Hash of the code that builds the template, so editing it invalidates the cache."""
+    src = ''.join(inspect.getsource(f) for f in (configure_render, add_light, setup_camera, build_base_scene))
+    return hashlib.sha1(src.encode()).hexdigest()
+
+
+def template_key(args):
+    """Settings that shape the cached scene; everything else is patched after loading."""
+    return json.dumps({
+        'template_version': TEMPLATE_VERSION,
+        'source_hash': template_source_hash(),
+        'blender_version': bpy.app.version_string,
+        'engine': args.engine,
+        'depth_pass': args.depth_pass,
+        'normal_pass': args.normal_pass,
+        'mask_pass': args.mask_pass,
+    }, sort_keys=True)
+
+
+def template_path(template_dir, key):
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return os.path.join(template_dir, f'startup_{digest}.blend')
+
+
+def build_base_scene(args):
+    """Factory scene with light, camera, render settings and compositor graph
+    (everything that does not depend on the object)."""
+    clear_scene()
+    add_light()
+    cam = setup_camera(args.focal_length, args.sensor_width, args.sensor_height)
+    file_out = configure_render(
+        args.engine, args.resolution[0], args.resolution[1], args.samples,
+        args.depth_pass, args.normal_pass, 255 if args.mask_pass else None
+    )
+    return cam, file_out
+
+
+def save_template(path, key):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    bpy.context.scene['template_key'] = key
+    bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(path), copy=True)
+
+
+def load_template(path, key):
+    """Open a cached startup scene. Returns (cam, file_out) or None if the
+    template is missing or was built from different settings."""
+    if not os.path.exists(path):
+        return None
+    bpy.ops.wm.open_mainfile(filepath=os.path.abspath(path), load_ui=False)
+    scene = bpy.context.scene
+    if scene.get('template_key') != key or scene.camera is None or not scene.node_tree:
+        return None
+    file_out = next((n for n in scene.node_tree.nodes if n.label == 'Dataset File Output'), None)
+    if file_out is None:
+        return None
+    return scene.camera, file_out
+
+
+def patch_template(cam, args):
+    """Apply the per-run parameters that are not part of the template key."""
+    scene = bpy.context.scene
+    scene.render.resolution_x = args.resolution[0]
+    scene.render.resolution_y = args.resolution[1]
+    if args.engine == 'cycles':
+        scene.cycles.samples = args.samples
+    else:
+        scene.eevee.taa_render_samples = args.samples
+    cam.data.lens = args.focal_length
+    cam.data.sensor_width = args.sensor_width
+    cam.data.sensor_height = args.sensor_height
+
+
+def camera_intrinsics_dict(cam, scene, resolution=None):
+    """Intrinsics at the scene render resolution, or rescaled to `resolution` (W, H)
+    for images downsampled from that render."""
     lens = cam.data.lens
     sw = cam.data.sensor_width
     sh = cam.data.sensor_height
@@ -380,6 +702,14 @@ def camera_intrinsics_dict(cam, scene):
     resy = scene.render.resolution_y
     fov_x = 2*math.atan(sw/(2*lens))
     fov_y = 2*math.atan(sh/(2*lens))
+    # Sensor fit AUTO: sensor_width spans the larger image dimension, square pixels.
+    f_px = lens / sw * max(resx, resy)
+    fx, fy = f_px, f_px
+    if resolution is not None:
+        sx = resolution[0] / resx
+        sy = resolution[1] / resy
+        fx, fy = fx*sx, fy*sy
+        resx, resy = resolution
     return {
         'focal_length_mm': lens,
         'sensor_width_mm': sw,
@@ -387,10 +717,604 @@ def camera_intrinsics_dict(cam, scene):
         'resolution': [resx, resy],
         'fov_x_deg': math.degrees(fov_x),
         'fov_y_deg': math.degrees(fov_y),
+        'focal_length_px': [fx, fy],
         'principal_point_px': [resx/2, resy/2],
     }
 
 
+# ---------------------------- Downsampling -------------------------------- #
+
+def load_image_array(path, non_color=False):
+    """Read an image via Blender into a float32 (H, W, 4) array (bottom-up rows)."""
+    img = bpy.data.images.load(path, check_existing=False)
+    if non_color:
+        img.colorspace_settings.name = 'Non-Color'
+    w, h = img.size
+    buf = np.empty(w*h*4, dtype=np.float32)
+    img.pixels.foreach_get(buf)
+    bpy.data.images.remove(img)
+    return buf.reshape(h, w, 4)
+
+
+def save_image_array(path, arr, file_format):
+    h, w = arr.shape[:2]
+    is_float = file_format == 'OPEN_EXR'
+    img = bpy.data.images.new(os.path.basename(path), w, h, alpha=True, float_buffer=is_float)
+    if is_float:
+        img.colorspace_settings.name = 'Non-Color'
+    img.pixels.foreach_set(np.ascontiguousarray(arr, dtype=np.float32).ravel())
+    img.filepath_raw = path
+    img.file_format = file_format
+    img.save()
+    bpy.data.images.remove(img)
+
+
+def load_mask_ids(path, max_value):
+    return np.rint(load_image_array(path, non_color=True)[..., 0] * max_value).astype(np.int64)
+
+
+def save_mask_png(path, ids, max_value):
+    """Write an integer ID array as a BW uint8/uint16 PNG through the scene image settings."""
+    scene = bpy.context.scene
+    settings = scene.render.image_settings
+    saved = (settings.file_format, settings.color_mode, settings.color_depth, settings.color_management)
+    h, w = ids.shape
+    img = bpy.data.images.new(os.path.basename(path), w, h, alpha=False, float_buffer=True)
+    img.colorspace_settings.name = 'Non-Color'
+    rgba = np.ones((h, w, 4), dtype=np.float32)
+    rgba[..., :3] = (ids / max_value)[..., None]
+    img.pixels.foreach_set(rgba.ravel())
+    try:
+        settings.file_format = 'PNG'
+        settings.color_mode = 'BW'
+        settings.color_depth = '8' if max_value == 255 else '16'
+        settings.color_management = 'OVERRIDE'
+        settings.view_settings.view_transform = 'Raw'
+        img.save_render(path, scene=scene)
+    finally:
+        (settings.file_format, settings.color_mode,
+         settings.color_depth, settings.color_management) = saved
+        bpy.data.images.remove(img)
+
+
+def mask_pixel_counts(ids, mask_ids):
+    """Visible pixels per object name (background excluded, zero-count objects kept)."""
+    counts = np.bincount(ids.ravel(), minlength=max(mask_ids) + 1)
+    return {name: int(counts[i]) for i, name in mask_ids.items() if i != 0}
+
+
+def _area_weights(n_in, n_out):
+    """(n_out, n_in) matrix of normalized source-pixel overlaps for box (area) filtering."""
+    edges = np.arange(n_out + 1) * (n_in / n_out)
+    lo = np.maximum(edges[:-1, None], np.arange(n_in)[None, :])
+    hi = np.minimum(edges[1:, None], np.arange(n_in)[None, :] + 1)
+    w = np.clip(hi - lo, 0.0, None)
+    return w / w.sum(axis=1, keepdims=True)
+
+
+def downsample_area(arr, w_out, h_out):
+    h, w = arr.shape[:2]
+    wy = _area_weights(h, h_out)
+    wx = _area_weights(w, w_out)
+    rows = np.tensordot(wy, arr, axes=(1, 0))                   # (h_out, w, c)
+    out = np.matmul(rows.transpose(0, 2, 1), wx.T)               # (h_out, c, w_out)
+    return out.transpose(0, 2, 1).astype(np.float32)
+
+
+def footprint_nearest_index(h, w, h_out, w_out):
+    """Flat source index of the pixel at the center of each output footprint."""
+    ys = ((np.arange(h_out) + 0.5) * (h / h_out)).astype(np.int64)
+    xs = ((np.arange(w_out) + 0.5) * (w / w_out)).astype(np.int64)
+    return (ys[:, None] * w + xs[None, :]).ravel()
+
+
+def footprint_min_index(depth, w_out, h_out):
+    """Flat source index of the closest (min-depth) pixel in each output footprint.
+
+    Gathering depth, normals and masks through the same index keeps them on
+    the same surface at silhouettes.
+    """
+    h, w = depth.shape
+    cy = np.floor(np.arange(h) * (h_out / h)).astype(np.int64)
+    cx = np.floor(np.arange(w) * (w_out / w)).astype(np.int64)
+    cell = (cy[:, None] * w_out + cx[None, :]).ravel()
+    order = np.lexsort((depth.ravel(), cell))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = cell[order[1:]] != cell[order[:-1]]
+    return order[first]
+
+
+def _srgb_to_linear(c):
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(c):
+    c = np.clip(c, 0.0, 1.0)
+    return np.where(c <= 0.0031308, c * 12.92, 1.055 * np.power(c, 1/2.4) - 0.055)
+
+
+def find_pass_file(view_dir, stem, ext='.exr'):
+    """Locate a compositor output (`Depth.exr`, or `Depth0001.exr` with a frame suffix)."""
+    exact = os.path.join(view_dir, f'{stem}{ext}')
+    if os.path.exists(exact):
+        return exact
+    matches = sorted(glob.glob(os.path.join(view_dir, f'{stem}[0-9]*{ext}')))
+    return matches[0] if matches else None
+
+
+def write_downsampled_levels(view_dir, levels, depth_rule, mask=None, mask_max=None):
+    """Write each (W, H) level into `view_dir/WxH/` from the full-resolution outputs.
+
+    Color is area filtered (PNG in linear light). Depth, normals and the
+    optional `mask` ID array are all gathered from one source pixel per
+    output pixel: the min-depth pixel of the footprint (`depth_rule` 'min')
+    or its center pixel ('nearest'), so no blended, non-existent surfaces or
+    IDs appear at silhouettes and the passes stay consistent with each other.
+    """
+    color_path = os.path.join(view_dir, 'rendered_image.png')
+    color = load_image_array(color_path) if os.path.exists(color_path) else None
+    if color is not None:
+        color[..., :3] = _srgb_to_linear(color[..., :3])
+    sources = {stem: find_pass_file(view_dir, stem) for stem in ('Image', 'Depth', 'Normal')}
+    arrays = {stem: load_image_array(path, non_color=(stem != 'Image'))
+              for stem, path in sources.items() if path}
+    src_shape = mask.shape if mask is not None else next((a.shape[:2] for a in arrays.values()), None)
+
+    written = {}
+    for (w, h) in levels:
+        level_dir = os.path.join(view_dir, f'{w}x{h}')
+        os.makedirs(level_dir, exist_ok=True)
+        paths = {}
+        if color is not None:
+            small = downsample_area(color, w, h)
+            small[..., :3] = _linear_to_srgb(small[..., :3])
+            save_image_array(os.path.join(level_dir, 'rendered_image.png'), small, 'PNG')
+            paths['color_png'] = 'rendered_image.png'
+        if 'Depth' in arrays and depth_rule == 'min':
+            pick = footprint_min_index(arrays['Depth'][..., 0], w, h)
+        elif src_shape is not None:
+            pick = footprint_nearest_index(src_shape[0], src_shape[1], h, w)
+        for stem, arr in arrays.items():
+            if stem == 'Image':
+                out = downsample_area(arr, w, h)
+            else:
+                out = arr.reshape(-1, arr.shape[-1])[pick].reshape(h, w, -1)
+            save_image_array(os.path.join(level_dir, f'{stem}.exr'), out, 'OPEN_EXR')
+            paths[f'exr_{stem.lower()}'] = f'{stem}.exr'
+        if mask is not None:
+            save_mask_png(os.path.join(level_dir, 'Mask.png'), mask.ravel()[pick].reshape(h, w), mask_max)
+            paths['mask_png'] = 'Mask.png'
+        written[(w, h)] = paths
+    return written
+
+
+def _pass_basename(view_dir, stem, ext='.exr'):
+    """File name actually written for a pass (the compositor adds a frame number)."""
+    path = find_pass_file(view_dir, stem, ext)
+    return os.path.basename(path) if path else None
+
+
+def build_camera_info(idx, pose, cam, scene, view_dir, out_root, args, mask_ids, mask_max, mask=None):
+    """Per-camera record for one sampled pose; also derives masks counts and
+    downsampled levels from the files already rendered into `view_dir`.
+    `mask` is the ID array when the caller already has it in memory."""
+    mw = cam.matrix_world
+    cam_quat = mw.to_quaternion()
+    cam_loc = mw.translation
+    cam_info = {
+        'index': idx,
+        'distance': pose['distance'],
+        'azimuth_deg': pose['azimuth_deg'],
+        'elevation_deg': pose['elevation_deg'],
+        'roll_deg': pose['roll_deg'],
+        'camera_location': list(cam_loc),
+        'camera_quaternion_wxyz': [cam_quat.w, cam_quat.x, cam_quat.y, cam_quat.z],
+        'camera_euler_xyz_deg': [math.degrees(a) for a in mw.to_euler('XYZ')],
+        'target_point': list(pose['target']),
+        'look_vector': list((mw.to_3x3() @ mathutils.Vector((0, 0, -1))).normalized()),
+        'intrinsics': camera_intrinsics_dict(cam, scene),
+        'paths': {
+            'color_png': None if args.geometry_only else
+                os.path.relpath(os.path.join(view_dir, 'rendered_image.png'), out_root),
+            'exr_image': None if args.geometry_only else _pass_basename(view_dir, 'Image'),
+            'exr_depth': _pass_basename(view_dir, 'Depth') if args.depth_pass else None,
+            'exr_normal': _pass_basename(view_dir, 'Normal') if args.normal_pass else None,
+            'mask_png': _pass_basename(view_dir, 'Mask', '.png') if args.mask_pass else None,
+        }
+    }
+    if 'coverage' in pose:
+        cam_info['coverage'] = pose['coverage']
+        cam_info['coverage_gain'] = pose['coverage_gain']
+    if mask_ids:
+        if mask is None:
+            mask_path = find_pass_file(view_dir, 'Mask', '.png')
+            mask = load_mask_ids(mask_path, mask_max) if mask_path else None
+        if mask is not None:
+            cam_info['mask_pixel_counts'] = mask_pixel_counts(mask, mask_ids)
+    if args.extra_resolutions:
+        level_paths = write_downsampled_levels(view_dir, args.extra_resolutions, args.depth_downsample,
+                                               mask, mask_max)
+        cam_info['levels'] = [
+            {
+                'resolution': [w, h],
+                'intrinsics': camera_intrinsics_dict(cam, scene, (w, h)),
+                'paths': {k: os.path.join(f'{w}x{h}', v) for k, v in level_paths[(w, h)].items()},
+            }
+            for (w, h) in args.extra_resolutions
+        ]
+    return cam_info
+
+
+# ---------------------------- Coverage Planning --------------------------- #
+
+def mesh_world_arrays(obj):
+    """World-space vertices, triangle indices, triangle normals and areas."""
+    mesh = obj.data
+    mesh.calc_loop_triangles()
+    n_verts, n_tris = len(mesh.vertices), len(mesh.loop_triangles)
+    # foreach_get needs buffers matching the RNA types (float32 / int32).
+    co = np.empty(n_verts*3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', co)
+    tris = np.empty(n_tris*3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get('vertices', tris)
+    normals = np.empty(n_tris*3, dtype=np.float32)
+    mesh.loop_triangles.foreach_get('normal', normals)
+    areas = np.empty(n_tris, dtype=np.float32)
+    mesh.loop_triangles.foreach_get('area', areas)
+
+    mw = np.array(obj.matrix_world)
+    co = co.reshape(-1, 3).astype(np.float64) @ mw[:3, :3].T + mw[:3, 3]
+    normals = normals.reshape(-1, 3).astype(np.float64) @ np.linalg.inv(mw[:3, :3])
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    return co, tris.reshape(-1, 3).astype(np.int64), normals, areas.astype(np.float64)
+
+
+def sample_surface_points(co, tris, normals, areas, count, seed):
+    """Area-weighted surface samples and their face normals."""
+    n_tris = len(tris)
+    rng = np.random.default_rng(seed)
+    pick = rng.choice(n_tris, size=count, p=areas / areas.sum())
+    r1 = np.sqrt(rng.random(count))[:, None]
+    r2 = rng.random(count)[:, None]
+    a, b, c = (co[tris[pick, k]] for k in range(3))
+    points = (1 - r1) * a + r1 * (1 - r2) * b + r1 * r2 * c
+    return points, normals[pick]
+
+
+def visible_points(points, normals, mesh, cam_matrix, intr, clip_start):
+    """Boolean mask of surface points seen by a camera.
+
+    Frustum and facing tests are vectorized; occlusion compares each point's
+    depth with a z-buffer of the mesh rasterized at the (low) resolution of
+    `intr`. `mesh` is (co, tris, closed, volume).
+    """
+    co, tris, closed, volume = mesh
+    mw = np.array(cam_matrix)
+    origin = mw[:3, 3]
+    depth, _ = rasterize(co, tris, mw, intr, clip_start,
+                         cull_back=can_cull_back(closed, volume, co, tris, origin))
+    pc = (points - origin) @ mw[:3, :3]          # camera space, -Z forward
+    z = -pc[:, 2]
+    fx, fy = intr['focal_length_px']
+    cx, cy = intr['principal_point_px']
+    w, h = intr['resolution']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u = fx * pc[:, 0] / z + cx
+        v = fy * pc[:, 1] / z + cy
+        inside = (z > clip_start) & (u >= 0) & (u < w) & (v >= 0) & (v < h)
+    to_cam = origin - points
+    cos = np.einsum('ij,ij->i', normals, to_cam) / np.linalg.norm(to_cam, axis=1)
+    candidates = np.flatnonzero(inside & (cos > 0))
+
+    # The buffer holds depth at pixel centers; a point up to a pixel away on a
+    # surface tilted by theta differs by about z * tan(theta) / f.
+    zc, c = z[candidates], np.maximum(cos[candidates], 0.1)
+    tol = zc * (1e-3 + np.sqrt(1.0 - c*c) / c / fx)
+    buf = depth[v[candidates].astype(np.int64), u[candidates].astype(np.int64)]
+    seen = np.zeros(len(points), dtype=bool)
+    seen[candidates] = zc <= buf + tol
+    return seen
+
+
+def plan_coverage_views(obj, pose_obj, capture_cams, scene, args):
+    """Greedy next-best-view selection over random candidate poses.
+
+    `capture_cams` lists the cameras rendered per pose (one, or every rig
+    camera); a pose sees the union of what they see. Returns the chosen
+    poses in render order, each with its world matrix and cumulative coverage.
+    """
+    co, tris, tri_normals, areas = mesh_world_arrays(obj)
+    points, normals = sample_surface_points(co, tris, tri_normals, areas, args.surface_samples, args.seed)
+    mesh = (co, tris) + mesh_cull_info(tris, co)
+    # Occlusion is tested on a z-buffer --plan_resolution pixels wide.
+    res_x, res_y = scene.render.resolution_x, scene.render.resolution_y
+    scale = min(1.0, args.plan_resolution / max(res_x, res_y))
+    low = (max(1, round(res_x * scale)), max(1, round(res_y * scale)))
+    intrinsics = [camera_intrinsics_dict(c, scene, resolution=low) for c in capture_cams]
+
+    candidates = []
+    visibility = np.zeros((args.plan_candidates, len(points)), dtype=bool)
+    for k in range(args.plan_candidates):
+        pose = sample_pose(args)
+        pose_obj.location = spherical_sample(pose['distance'], pose['azimuth_deg'], pose['elevation_deg'])
+        look_at(pose_obj, pose['target'], pose['roll_deg'])
+        bpy.context.view_layer.update()
+        pose['matrix'] = pose_obj.matrix_world.copy()
+        for c, intr in zip(capture_cams, intrinsics):
+            visibility[k] |= visible_points(points, normals, mesh, c.matrix_world,
+                                            intr, c.data.clip_start)
+        candidates.append(pose)
+
+    covered = np.zeros(len(points), dtype=bool)
+    chosen = []
+    while len(chosen) < args.views:
+        gains = (visibility & ~covered).sum(axis=1)
+        best = int(np.argmax(gains))
+        if gains[best] == 0:
+            print('[plan] no candidate adds unseen surface; stopping')
+            break
+        covered |= visibility[best]
+        coverage = float(covered.mean())
+        pose = candidates[best]
+        pose['coverage'] = coverage
+        pose['coverage_gain'] = int(gains[best]) / len(points)
+        chosen.append(pose)
+        print(f'[plan] view {len(chosen)}: candidate {best}, +{pose["coverage_gain"]:.3f} -> coverage {coverage:.3f}')
+        if coverage >= args.coverage_target:
+            break
+    return chosen, float(covered.mean())
+
+
+# ---------------------------- Geometry-only Rasterizer -------------------- #
+
+# Depth written for background pixels, matching the Cycles Z pass.
+BACKGROUND_DEPTH = 1e10
+
+# Upper bound on (triangle, pixel) candidates held at once by the NumPy path.
+FRAGMENT_BUDGET = 1 << 19
+
+try:
+    import numba
+except ImportError:  # optional: the NumPy path is used instead
+    numba = None
+
+
+def mesh_cull_info(tris, co):
+    """(closed, signed_volume) for a triangle mesh.
+
+    Back-face culling is exact only for closed, consistently wound meshes:
+    every directed edge must appear once and its reverse once.
+    """
+    n = len(co)
+    e = np.concatenate([tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]]])
+    fwd = e[:, 0] * n + e[:, 1]
+    rev = e[:, 1] * n + e[:, 0]
+    closed = len(np.unique(fwd)) == len(fwd) and bool(np.isin(rev, fwd).all())
+    a, b, c = co[tris[:, 0]], co[tris[:, 1]], co[tris[:, 2]]
+    volume = float(np.einsum('ij,ij->', a, np.cross(b, c))) / 6.0
+    return closed, volume
+
+
+def winding_number(co, tris, point):
+    """Generalized winding number of `point` (sum of triangle solid angles / 4pi)."""
+    a = co[tris[:, 0]] - point
+    b = co[tris[:, 1]] - point
+    c = co[tris[:, 2]] - point
+    la, lb, lc = (np.linalg.norm(x, axis=1) for x in (a, b, c))
+    num = np.einsum('ij,ij->i', a, np.cross(b, c))
+    den = la*lb*lc + np.einsum('ij,ij->i', a, b)*lc + np.einsum('ij,ij->i', a, c)*lb \
+        + np.einsum('ij,ij->i', b, c)*la
+    return float(np.sum(2.0 * np.arctan2(num, den)) / (4.0 * np.pi))
+
+
+def can_cull_back(closed, volume, co, tris, cam_pos):
+    """True when no back face can be the first hit from `cam_pos`: a closed
+    outward mesh seen from outside, or a single inward shell (builtin:room)
+    seen from inside."""
+    if not closed or volume == 0.0:
+        return False
+    w = round(winding_number(co, tris, cam_pos))
+    return w == (0 if volume > 0 else -1)
+
+
+def _clip_near(tp, clip_start):
+    """Clip camera-space triangles (T, 3, 3) against z = -clip_start.
+
+    Returns (source triangle index, clipped triangles); a triangle with one
+    vertex behind the plane becomes two, winding is preserved.
+    """
+    inside = -tp[..., 2] > clip_start
+    n_in = inside.sum(1)
+    whole = np.flatnonzero(n_in == 3)
+    # Rotate vertices so the lone inside vertex (one in) or the lone outside
+    # vertex (two in) comes first; cyclic rotation keeps the winding.
+    one = np.flatnonzero(n_in == 1)
+    two = np.flatnonzero(n_in == 2)
+    rot1 = (np.argmax(inside[one], axis=1)[:, None] + np.arange(3)) % 3
+    rot2 = (np.argmin(inside[two], axis=1)[:, None] + np.arange(3)) % 3
+    p1 = np.take_along_axis(tp[one], rot1[..., None], axis=1)
+    p2 = np.take_along_axis(tp[two], rot2[..., None], axis=1)
+
+    def cut(a, b):
+        t = (-clip_start - a[:, 2]) / (b[:, 2] - a[:, 2])
+        return a + t[:, None] * (b - a)
+
+    # One in: (A, B', C') with B', C' on edges AB and AC.
+    t1 = np.stack([p1[:, 0], cut(p1[:, 0], p1[:, 1]), cut(p1[:, 0], p1[:, 2])], axis=1)
+    # Two in (A out): quad (AB', B, C, CA') as two triangles.
+    ab, ca = cut(p2[:, 1], p2[:, 0]), cut(p2[:, 2], p2[:, 0])
+    t2a = np.stack([ab, p2[:, 1], p2[:, 2]], axis=1)
+    t2b = np.stack([ab, p2[:, 2], ca], axis=1)
+    src = np.concatenate([whole, one, two, two])
+    return src, np.concatenate([tp[whole], t1, t2a, t2b])
+
+
+def _triangle_setup(co, tris, cam_matrix, intr, clip_start, cull_back):
+    """Project triangles and build per-triangle screen-space planes.
+
+    Barycentrics w0, w1 and 1/z are affine in pixel coordinates, so every
+    fragment only evaluates three plane equations.
+    """
+    mw = np.array(cam_matrix)
+    pc = (co - mw[:3, 3]) @ mw[:3, :3]
+    src, tp = _clip_near(pc[tris], clip_start)
+    fx, fy = intr['focal_length_px']
+    cx, cy = intr['principal_point_px']
+    w, h = intr['resolution']
+    tz = -tp[..., 2]
+    tu = fx * tp[..., 0] / tz + cx
+    tv = fy * tp[..., 1] / tz + cy
+
+    xmin = np.maximum(np.ceil(tu.min(1) - 0.5), 0)
+    xmax = np.minimum(np.floor(tu.max(1) - 0.5), w - 1)
+    ymin = np.maximum(np.ceil(tv.min(1) - 0.5), 0)
+    ymax = np.minimum(np.floor(tv.max(1) - 0.5), h - 1)
+    # Counter-clockwise in the y-up image means the face points at the camera.
+    area = (tu[:, 1]-tu[:, 0])*(tv[:, 2]-tv[:, 0]) - (tu[:, 2]-tu[:, 0])*(tv[:, 1]-tv[:, 0])
+    keep = (xmax >= xmin) & (ymax >= ymin)
+    keep &= (area > 1e-12) if cull_back else (np.abs(area) > 1e-12)
+    sel = np.flatnonzero(keep)
+    idx = src[sel]
+
+    u0, u1, u2 = tu[sel].T
+    v0, v1, v2 = tv[sel].T
+    inv_a = 1.0 / area[sel]
+    a0, b0 = (v1 - v2) * inv_a, (u2 - u1) * inv_a
+    c0 = (u1*v2 - u2*v1) * inv_a
+    a1, b1 = (v2 - v0) * inv_a, (u0 - u2) * inv_a
+    c1 = (u2*v0 - u0*v2) * inv_a
+    iz0, iz1, iz2 = (1.0 / tz[sel]).T
+    planes = np.ascontiguousarray(np.stack([
+        a0, b0, c0, a1, b1, c1,
+        a0*iz0 + a1*iz1 - (a0 + a1)*iz2,
+        b0*iz0 + b1*iz1 - (b0 + b1)*iz2,
+        c0*iz0 + c1*iz1 + (1.0 - c0 - c1)*iz2,
+    ], axis=1))
+    bounds = np.stack([xmin[sel], xmax[sel], ymin[sel], ymax[sel]], axis=1).astype(np.int64)
+    return idx, bounds, planes
+
+
+# Small tolerance so pixel centers exactly on a shared edge never crack.
+_EDGE_EPS = 1e-9
+
+
+def _raster_numpy(idx, bounds, planes, w, h, budget):
+    inv_depth = np.zeros(w*h)
+    tri_buf = np.full(w*h, -1, dtype=np.int64)
+    bw = bounds[:, 1] - bounds[:, 0] + 1
+    cnt_all = bw * (bounds[:, 3] - bounds[:, 2] + 1)
+    # Split on a fragment budget so memory stays bounded for big triangles.
+    cum = np.cumsum(cnt_all)
+    total = int(cum[-1]) if len(cum) else 0
+    cuts = np.searchsorted(cum, np.arange(budget, total, budget), side='right')
+    edges = np.unique(np.concatenate([[0], cuts, [len(idx)]]))
+    for start, stop in zip(edges[:-1], edges[1:]):
+        cnt = cnt_all[start:stop]
+        # One entry per (triangle, pixel in its bounding box).
+        local = np.repeat(np.arange(start, stop), cnt)
+        k = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        tbw = bw[local]
+        px = bounds[local, 0] + k % tbw
+        py = bounds[local, 2] + k // tbw
+        sx, sy = px + 0.5, py + 0.5
+        pa0, pb0, pc0, pa1, pb1, pc1, pz_a, pz_b, pz_c = planes[local].T
+        w0 = pa0*sx + pb0*sy + pc0
+        w1 = pa1*sx + pb1*sy + pc1
+        inside = (w0 >= -_EDGE_EPS) & (w1 >= -_EDGE_EPS) & (w0 + w1 <= 1 + _EDGE_EPS)
+        invz = (pz_a*sx + pz_b*sy + pz_c)[inside]
+        pid = (py * w + px)[inside]
+        tri = idx[local[inside]]
+        # Z-buffer: keep the largest 1/z (nearest fragment) per pixel.
+        np.maximum.at(inv_depth, pid, invz)
+        win = invz >= inv_depth[pid]
+        tri_buf[pid[win]] = tri[win]
+    return inv_depth, tri_buf
+
+
+if numba is not None:
+    @numba.njit(cache=True, nogil=True)
+    def _raster_numba(idx, bounds, planes, w, h):
+        inv_depth = np.zeros(w*h)
+        tri_buf = np.full(w*h, -1, dtype=np.int64)
+        for i in range(len(idx)):
+            pa0, pb0, pc0 = planes[i, 0], planes[i, 1], planes[i, 2]
+            pa1, pb1, pc1 = planes[i, 3], planes[i, 4], planes[i, 5]
+            pz_a, pz_b, pz_c = planes[i, 6], planes[i, 7], planes[i, 8]
+            for py in range(bounds[i, 2], bounds[i, 3] + 1):
+                sy = py + 0.5
+                r0 = pb0*sy + pc0
+                r1 = pb1*sy + pc1
+                rz = pz_b*sy + pz_c
+                for px in range(bounds[i, 0], bounds[i, 1] + 1):
+                    sx = px + 0.5
+                    w0 = pa0*sx + r0
+                    w1 = pa1*sx + r1
+                    if w0 >= -_EDGE_EPS and w1 >= -_EDGE_EPS and w0 + w1 <= 1 + _EDGE_EPS:
+                        invz = pz_a*sx + rz
+                        pid = py*w + px
+                        if invz > inv_depth[pid]:
+                            inv_depth[pid] = invz
+                            tri_buf[pid] = idx[i]
+        return inv_depth, tri_buf
+
+
+def rasterize(co, tris, cam_matrix, intr, clip_start, cull_back=False, backend=None,
+              budget=FRAGMENT_BUDGET):
+    """Z-buffer rasterization of world-space triangles.
+
+    Uses the pinhole model of `camera_intrinsics_dict` (focal_length_px,
+    principal_point_px, pixel centers at +0.5) and Blender's camera frame
+    (-Z forward, Y up). Rows are bottom-up like Blender image pixels. Both
+    triangle sides are drawn, as in Cycles, unless `cull_back` (see
+    `can_cull_back`); triangles are clipped at `clip_start`. `backend` is
+    'numba' (default when installed) or 'numpy'. Returns (depth, tri_index)
+    arrays of shape (H, W); depth is distance along the view axis, tri_index
+    is -1 for background.
+    """
+    w, h = intr['resolution']
+    idx, bounds, planes = _triangle_setup(co, tris, cam_matrix, intr, clip_start, cull_back)
+    if backend is None:
+        backend = 'numba' if numba is not None else 'numpy'
+    if backend == 'numba':
+        inv_depth, tri_buf = _raster_numba(idx.astype(np.int64), bounds, planes, w, h)
+    else:
+        inv_depth, tri_buf = _raster_numpy(idx, bounds, planes, w, h, budget)
+    depth = np.where(tri_buf >= 0, 1.0 / np.where(inv_depth > 0, inv_depth, 1.0), BACKGROUND_DEPTH)
+    return depth.reshape(h, w), tri_buf.reshape(h, w)
+
+
+def render_geometry_view(view_dir, cam, scene, mesh_arrays, obj_id, args, mask_max):
+    """Rasterize and write the enabled geometric passes under the compositor's
+    frame-suffixed file names (Depth0001.exr, Normal0001.exr, Mask0001.png).
+    Returns the mask ID array, or None without a mask pass."""
+    co, tris, tri_normals, closed, volume = mesh_arrays
+    os.makedirs(view_dir, exist_ok=True)
+    cam_pos = np.array(cam.matrix_world.translation)
+    cull = can_cull_back(closed, volume, co, tris, cam_pos)
+    depth, tri = rasterize(co, tris, cam.matrix_world, camera_intrinsics_dict(cam, scene),
+                           cam.data.clip_start, cull_back=cull)
+    hit = tri >= 0
+    h, w = depth.shape
+    frame = f'{scene.frame_current:04d}'
+    if args.depth_pass:
+        rgba = np.ones((h, w, 4), dtype=np.float32)
+        rgba[..., :3] = depth[..., None]
+        save_image_array(os.path.join(view_dir, f'Depth{frame}.exr'), rgba, 'OPEN_EXR')
+    if args.normal_pass:
+        # World space, flat shaded, flipped toward the viewer like Cycles' N.
+        facing = np.einsum('ij,ij->i', tri_normals, cam_pos - co[tris[:, 0]]) >= 0
+        normals = np.where(facing[:, None], tri_normals, -tri_normals)
+        rgba = np.zeros((h, w, 4), dtype=np.float32)
+        rgba[..., 3] = 1.0
+        rgba[hit, :3] = normals[tri[hit]]
+        save_image_array(os.path.join(view_dir, f'Normal{frame}.exr'), rgba, 'OPEN_EXR')
+    if mask_max is None:
+        return None
+    mask = np.where(hit, obj_id, 0)
+    save_mask_png(os.path.join(view_dir, f'Mask{frame}.png'), mask, mask_max)
+    return mask
+
+
 def save_json(path, data):
     with open(path, 'w') as f:
         json.dump(data, f, indent=2)
@@ -398,26 +1322,69 @@ def save_json(path, data):
 # ---------------------------- Main Procedure ------------------------------ #
 
 def main():
+    t_launch = time.time()
     args = parse_args()
     random.seed(args.seed)
 
-    clear_scene()
-
-    obj = import_object(args.object_source, args.object_name)
-    add_light()
-    cam = setup_camera(args.focal_length, args.sensor_width, args.sensor_height)
+    rig = load_rig(args.rig, args) if args.rig else None
+    startup_mode = 'factory'
+    if rig:
+        # Rig cameras and multiview views are built per rig, so no template.
+        clear_scene()
+        obj = import_object(args.object_source, args.object_name)
+        add_light()
+        cam, rig_cams = setup_rig(rig)  # the rig root takes the sampled pose
+        capture_cams = [c for _, c, _ in rig_cams]
+        file_out_node = configure_render(
+            args.engine, args.resolution[0], args.resolution[1], args.samples,
+            args.depth_pass, args.normal_pass, 255 if args.mask_pass else None
+        )
+    else:
+        base = None
+        if not args.no_template:
+            key = template_key(args)
+            path = template_path(args.template_dir, key)
+            base = load_template(path, key)
+        if base:
+            cam, file_out_node = base
+            patch_template(cam, args)
+            startup_mode = 'template'
+        else:
+            cam, file_out_node = build_base_scene(args)
+            if not args.no_template:
+                save_template(path, key)
+                startup_mode = 'factory+template_saved'
+        obj = import_object(args.object_source, args.object_name)
+        capture_cams = [cam]
 
     obj_stats = compute_object_stats(obj)
+    mask_ids = assign_mask_ids(bpy.context.scene) if args.mask_pass else None
+    mask_max = mask_max_value(mask_ids) if mask_ids else None
+    if mask_max:
+        update_mask_range(bpy.context.scene, file_out_node, mask_max)
+    # From main() on; Blender / bpy boot before the script runs is not included.
+    startup_seconds = time.time() - t_launch
+    print(f'Startup ({startup_mode}): {startup_seconds:.3f}s')
 
     out_root = ensure_output_dir(args.output_root, args.object_name)
 
-    file_out_node = configure_render(
-        args.engine, args.resolution[0], args.resolution[1], args.samples,
-        args.depth_pass, args.normal_pass
-    )
-
     scene = bpy.context.scene
 
+    mesh_arrays = None
+    if args.geometry_only:
+        # Export the mesh once; every view is rasterized from these arrays.
+        co, tris, tri_normals, _ = mesh_world_arrays(obj)
+        mesh_arrays = (co, tris, tri_normals) + mesh_cull_info(tris, co)
+        obj_id = obj.pass_index if mask_ids else 0
+
+    planned = None
+    if args.plan == 'coverage':
+        t_plan = time.time()
+        planned, coverage = plan_coverage_views(obj, cam, capture_cams, scene, args)
+        planning_seconds = time.time() - t_plan
+        print(f'Planning: {planning_seconds:.2f}s for {args.plan_candidates} candidates')
+    n_views = len(planned) if planned is not None else args.views
+
     global_meta = {
         'object_name': args.object_name,
         'object_source': args.object_source,
@@ -425,68 +1392,84 @@ def main():
         'config': vars(args),
         'blender_version': bpy.app.version_string,
         'datetime': datetime.now().isoformat(),
-        'total_views': args.views,
-        'engine': scene.render.engine,
+        'total_views': n_views,
+        'engine': 'NUMPY_RASTER' if args.geometry_only else scene.render.engine,
+        'startup_mode': startup_mode,
+        'startup_seconds': startup_seconds,
     }
+    if mask_ids:
+        global_meta['mask_ids'] = {str(i): name for i, name in mask_ids.items()}
+        global_meta['mask_dtype'] = 'uint8' if mask_max == 255 else 'uint16'
+    if rig:
+        global_meta['rig'] = rig
+    if planned is not None:
+        global_meta['coverage_plan'] = {
+            'target': args.coverage_target,
+            'reached': coverage,
+            'surface_samples': args.surface_samples,
+            'candidates': args.plan_candidates,
+            'plan_resolution': args.plan_resolution,
+            'planning_seconds': planning_seconds,
+            'coverage_per_view': [p['coverage'] for p in planned],
+        }
 
     # Save placeholder global metadata early
     save_json(os.path.join(out_root, 'metadata.json'), global_meta)
 
     # Generate views
-    for idx in range(1, args.views+1):
-        # Random spherical sample
-        dist = random.uniform(args.distance_min, args.distance_max)
-        elev = random.uniform(args.elev_min, args.elev_max)
-        azim = random.uniform(args.azim_min, args.azim_max)
-        roll = random.uniform(args.roll_min, args.roll_max)
-
-        cam_pos = spherical_sample(dist, azim, elev)
-        cam.location = cam_pos
-
-        target = mathutils.Vector((0,0,0))
-        if args.jitter_target > 0:
-            jt = args.jitter_target
-            target += mathutils.Vector((random.uniform(-jt,jt), random.uniform(-jt,jt), random.uniform(-jt,jt)))
-
-        look_at(cam, target, roll)
+    t_start = time.time()
+    for idx in range(1, n_views+1):
+        if planned is not None:
+            pose = planned[idx-1]
+            cam.matrix_world = pose['matrix']
+        else:
+            # Random spherical sample
+            pose = sample_pose(args)
+            cam.location = spherical_sample(pose['distance'], pose['azimuth_deg'], pose['elevation_deg'])
+            look_at(cam, pose['target'], pose['roll_deg'])
 
         view_dir = os.path.join(out_root, f'{idx:05d}')
         os.makedirs(view_dir, exist_ok=True)
 
+        if args.geometry_only:
+            bpy.context.view_layer.update()
+            for spec, view_cam in ([(spec, c) for spec, c, _ in rig_cams] if rig else [(None, cam)]):
+                cam_dir = os.path.join(view_dir, spec['name']) if spec else view_dir
+                mask = render_geometry_view(cam_dir, view_cam, scene, mesh_arrays, obj_id, args, mask_max)
+                cam_info = build_camera_info(idx, pose, view_cam, scene, cam_dir, out_root,
+                                             args, mask_ids, mask_max, mask)
+                if spec:
+                    cam_info['rig'] = rig_baseline_dict(spec, rig)
+                save_json(os.path.join(cam_dir, 'camera_info.json'), cam_info)
+            continue
+
         # Set paths
         scene.render.filepath = os.path.join(view_dir, 'rendered_image.png')
-        file_out_node.base_path = view_dir  # EXRs will be named Image.exr, Depth.exr, Normal.exr
+        file_out_node.base_path = view_dir  # EXRs will be named Image0001.exr, Depth0001.exr, ...
 
-        # Render
+        # Render (all rig cameras at once in multiview mode)
         bpy.ops.render.render(write_still=True)
-
-        # Gather camera info
-        cam_quat = cam.matrix_world.to_quaternion()
-        cam_info = {
-            'index': idx,
-            'distance': dist,
-            'azimuth_deg': azim,
-            'elevation_deg': elev,
-            'roll_deg': roll,
-            'camera_location': list(cam.location),
-            'camera_quaternion_wxyz': [cam_quat.w, cam_quat.x, cam_quat.y, cam_quat.z],
-            'camera_euler_xyz_deg': [math.degrees(a) for a in cam.rotation_euler],
-            'target_point': list(target),
-            'look_vector': list((target - cam.location).normalized()),
-            'intrinsics': camera_intrinsics_dict(cam, scene),
-            'paths': {
-                'color_png': os.path.relpath(scene.render.filepath, out_root),
-                'exr_image': 'Image.exr',
-                'exr_depth': 'Depth.exr' if args.depth_pass else None,
-                'exr_normal': 'Normal.exr' if args.normal_pass else None,
-            }
-        }
-        save_json(os.path.join(view_dir, 'camera_info.json'), cam_info)
+        bpy.context.view_layer.update()
+        if rig:
+            split_multiview_outputs(view_dir, rig_cams)
+            for spec, rig_cam, _ in rig_cams:
+                cam_dir = os.path.join(view_dir, spec['name'])
+                cam_info = build_camera_info(idx, pose, rig_cam, scene, cam_dir, out_root,
+                                             args, mask_ids, mask_max)
+                cam_info['rig'] = rig_baseline_dict(spec, rig)
+                save_json(os.path.join(cam_dir, 'camera_info.json'), cam_info)
+        else:
+            cam_info = build_camera_info(idx, pose, cam, scene, view_dir, out_root,
+                                         args, mask_ids, mask_max)
+            save_json(os.path.join(view_dir, 'camera_info.json'), cam_info)
 
     # Update global metadata with finished flag
+    elapsed = time.time() - t_start
     global_meta['completed'] = True
+    global_meta['render_seconds'] = elapsed
     save_json(os.path.join(out_root, 'metadata.json'), global_meta)
-    print(f'Finished rendering {args.views} views. Output at: {out_root}')
+    print(f'Finished rendering {n_views} views in {elapsed:.1f}s '
+          f'({60.0 * n_views / max(elapsed, 1e-9):.0f} views/min). Output at: {out_root}')
 
 if __name__ == '__main__':
     main()
@@ -18,12 +18,18 @@ results/<object_name>_render_output_YYYYmmdd_HHMMSS/
   metadata.json                # Global configuration + object stats
   00001/
     rendered_image.png         # Color (PNG)
-    Image.exr                  # Full combined EXR (from compositor)
-    Depth.exr (optional)       # If --depth_pass
-    Normal.exr (optional)      # If --normal_pass
+    Image0001.exr              # Full combined EXR (from compositor; the
+                               # compositor appends the frame number)
+    Depth0001.exr (optional)   # If --depth_pass
+    Normal0001.exr (optional)  # If --normal_pass
+    Mask0001.png (optional)    # If --mask_pass (uint8/uint16 object IDs)
     camera_info.json           # Per‑view intrinsic & extrinsic data
+    320x240/ (optional)        # One folder per --extra_resolutions level
+      rendered_image.png, Image.exr, Depth.exr, Normal.exr, Mask.png
   00002/
     ...
+With --rig, each pose folder holds one subfolder per rig camera instead:
+  00001/left/{rendered_image.png, *.exr, camera_info.json}, 00001/right/...
   ...
 
 KEY FEATURES
@@ -32,10 +38,16 @@ KEY FEATURES
 * Configurable ranges for distance, azimuth, elevation, roll.
 * Cycles or Eevee rendering.
 * Optional depth & normal passes (EXR) via compositor.
+* Optional object-index mask pass (integer PNG) with per-view pixel counts.
 * Intrinsics (focal length, FOV, principal point) recorded.
 * Extrinsics in quaternion (wxyz) + Euler (XYZ) + look vector.
 * Object statistics: vertex count, face count, AABB local & world.
 * Reproducible sampling via --seed.
+* Multi-resolution outputs from a single render (--extra_resolutions).
+* Geometry-only CPU rasterizer for depth/normal/mask (--geometry_only).
+* Coverage-driven next-best-view planning (--plan coverage).
+* Cached startup scene template for fast process launch.
+* Multi-camera rigs (stereo pairs, side cameras) rendered per pose (--rig).
 
 COMMAND SYNTAX
 --------------
@@ -67,7 +79,54 @@ RENDER / INTRINSICS ARGS
 --sensor_height MM        Sensor height (mm)
 --depth_pass              Enable Z pass (Depth.exr)
 --normal_pass             Enable Normal pass (Normal.exr)
+--mask_pass               Enable object index mask (Mask.png; Cycles or
+                          --geometry_only, not Eevee). Each mesh gets a pass_index;
+                          IDs are stored as uint8 (uint16 if more than 255
+                          objects), 0 = background. Color outputs are unchanged:
+                          the mask slot is not dithered, so the scene's
+                          dither_intensity stays as is for rendered_image.png.
 --seed N                  Random seed for reproducibility
+--extra_resolutions W H [W H ...]
+                          Extra output sizes (each <= --resolution). Every view is
+                          rendered once at --resolution and downsampled: color is
+                          area filtered (in linear light).
+--depth_downsample min|nearest
+                          Source pixel used for depth, normals and mask in the extra
+                          levels (default min: the closest pixel of each footprint,
+                          so all three stay on the same surface at silhouettes;
+                          nearest: the footprint's center pixel)
+--geometry_only           Skip Cycles/Eevee. The mesh is exported once as vertex and
+                          triangle arrays and Depth0001.exr / Normal0001.exr /
+                          Mask0001.png (the compositor's names) are rasterized per
+                          view with a z-buffer using the same intrinsics and camera
+                          frame as camera_info.json. Uses a numba kernel when numba
+                          is installed, else a NumPy path that works through the
+                          triangles in chunks of at most 2^19 (triangle, pixel)
+                          candidates (~180 MB peak over Blender's own, independent of
+                          triangle size). Back faces are culled when the mesh is
+                          closed and the camera is outside it (inside for an inward
+                          shell such as builtin:room). Triangles are clipped at the
+                          camera's clip_start. No color outputs. Flat-shaded
+                          world-space normals flipped toward the camera, as Cycles'.
+                          Validate against a Cycles run with check_geometry_parity.py.
+--plan random|coverage    random (default) samples views independently; coverage
+                          samples --plan_candidates poses from the same ranges,
+                          tests --surface_samples area-weighted surface points for
+                          visibility (frustum + facing, then a depth test against
+                          the mesh rasterized at --plan_resolution) and greedily
+                          renders the pose adding the most unseen surface until
+                          --coverage_target (0-1, default 0.95) or --views is hit.
+                          Coverage per view and planning time are printed.
+--plan_resolution N       Longest side of the planning depth buffers (default 160).
+                          Against exact BVH ray casts (suzanne, 128 poses at 3-6 m)
+                          it marks 3.3% extra points visible at 160 (1.5% at 320,
+                          thin parts missed between pixel centers) and misses 0.7%.
+                          Planning 256 candidates x 4000 samples takes 0.7-0.9 s
+                          (BVH: 1.2-2.4 s); with 20000 samples a candidate costs
+                          5 ms instead of 36 ms.
+--rig PATH                JSON rig attached to each sampled pose (see RIG FILES)
+--template_dir PATH       Cache of startup templates (default .template_cache)
+--no_template             Build the startup scene from factory settings every run
 --output_root PATH        Parent directory for output dataset (default 'results')
 
 EXAMPLES
@@ -115,31 +174,120 @@ EXAMPLES
     --resolution 512 512 \
     --engine cycles --samples 32 --seed 99
 
+STARTUP TEMPLATE
+----------------
+The light, camera, render settings and compositor graph only depend on the
+engine and the enabled passes. The first run with a given combination saves
+them to <template_dir>/startup_<hash>.blend; later runs open that file instead
+of resetting to factory settings and rebuilding with bpy.ops / node calls, and
+only patch resolution, samples and lens/sensor. The hash covers
+TEMPLATE_VERSION, a hash of the source of configure_render, add_light,
+setup_camera and build_base_scene (editing them rebuilds the template), the
+Blender version, engine and passes, so stale templates are rebuilt
+automatically. All scripts/render_*.sh runs with the same passes share one
+template. Startup time is printed ("Startup (template): 0.123s") and stored
+as startup_seconds / startup_mode in metadata.json. It is measured from the
+start of main(), so it excludes Blender / bpy boot. Process wall time with
+--views 0 --depth_pass --normal_pass --mask_pass (cycles; median of 20
+interleaved runs with bpy 4.5.2 as a Python module):
+  template      1.19 s   (startup_seconds 0.022 s)
+  --no_template 1.29 s   (startup_seconds 0.109 s)
+  import bpy    0.81 s   (boot alone)
+So the template saves ~0.1 s per launch; boot dominates. Rig runs always
+build from factory settings.
+
+GEOMETRY-ONLY PASSES
+--------------------
+Rasterization time per view (3968-triangle sphere filling about half the frame,
+single CPU thread, Blender's numpy):
+  resolution   numpy   numpy+cull   numba   numba+cull
+  320x240      45 ms     17 ms       4.1 ms    4.3 ms
+  640x480     177 ms     84 ms      11.8 ms    8.4 ms
+  800x800     292 ms    147 ms      16.4 ms    9.5 ms
+End to end (the "Finished ... views/min" line: rasterize, write files,
+camera_info.json), suzanne, 200 views, 1 CPU; runs vary by ~15%:
+  resolution   passes               numba        numpy
+  320x240      depth+normal+mask    2124/min      813/min
+  320x240      depth                3105/min      946/min
+  640x480      depth+normal+mask     586/min      192/min
+  640x480      depth                1217/min      230/min
+  800x800      depth+normal+mask     294/min       80/min
+  800x800      depth                 635/min       97/min
+With numba, writing the files dominates: at 640x480 each 32-bit EXR takes
+15-25 ms and the mask PNG ~30 ms, against ~12 ms to rasterize. Thousands of
+views per minute are reached at 320x240 with numba, not at 640x480 and above.
+For comparison Cycles at 640x480, 16 samples takes 10-20 s per view here.
+check_geometry_parity.py exits 1 when a view is below --min_iou (default
+0.98) or above --max_depth_rel_err (1e-3, median on interior pixels) or
+--max_normal_deg (1.0, median). Against Cycles (640x480, 8 views, seed 5,
+distance 3-6, elevation -60..60) suzanne, sphere, cube and room (camera
+both inside and outside the inverted cube) all give IoU 1.0000, depth error
+<= 7e-7 and normal error 0.000 deg; the file names match.
+
+RIG FILES
+---------
+  {"cameras": [
+     {"name": "left",  "location": [-0.03, 0, 0]},
+     {"name": "right", "location": [0.03, 0, 0]},
+     {"name": "side",  "location": [0.25, 0, 0.05],
+      "rotation_euler_deg": [0, 30, 0], "focal_length": 35}]}
+
+location / rotation_euler_deg are relative to the sampled pose (camera frame:
+X right, Y up, -Z forward). focal_length / sensor_width / sensor_height fall
+back to the CLI values; all rig cameras share --resolution. The first camera
+is the baseline reference. Rig cameras are rendered as Blender multiview
+views: one render call per pose, but Cycles still samples, denoises and
+composites every camera, so N cameras cost close to N renders. Only scene
+sync and BVH build are shared, and Cycles runs keep those between renders
+anyway (render.use_persistent_data), so a rig is not faster than the same
+number of single-camera views. Measured on 1 CPU, 320x240, stereo_side_rig
+(3 cameras) vs. the same number of single views:
+  suzanne, 16 samples    4 poses x 3: 138.9 s   12 views: 128.8 s
+  suzanne, 1 sample      6 poses x 3:  41.6 s   18 views:  41.1 s
+  1M-triangle mesh, 1 sample, 3 poses x 3 vs 9 views:
+    without persistent data            18.1 s             23.5 s
+    with persistent data               18.1 s             17.3 s
+Per camera, sampling plus OIDN denoising dominates (2.3 s at 1 sample here);
+sync/BVH is ~0 s for suzanne and 0.9 s for the 1M-triangle mesh. Use rigs for
+the synchronized poses and baseline metadata, not for speed.
+Example: rigs/stereo_side_rig.json.
+
 DATASET METADATA FIELDS (GLOBAL)
 --------------------------------
 object_name, object_source, object_stats (vertices, faces, bbox info),
-config (all CLI args), blender_version, datetime, total_views, engine, completed.
+config (all CLI args), blender_version, datetime, total_views, engine, completed,
+startup_mode, startup_seconds, render_seconds (engine is NUMPY_RASTER with --geometry_only).
+With --plan coverage also coverage_plan (target, reached, surface_samples,
+candidates, plan_resolution, planning_seconds, coverage_per_view);
+total_views is the number actually rendered.
+With --mask_pass also mask_ids (ID -> object name) and mask_dtype.
 
 PER-VIEW CAMERA INFO
 --------------------
 index, distance, azimuth_deg, elevation_deg, roll_deg,
 camera_location, camera_quaternion_wxyz, camera_euler_xyz_deg,
-look_vector, target_point, intrinsics {...}, and relative paths.
+look_vector, target_point, intrinsics {...}, and relative paths (the actual
+file names written, e.g. Depth0001.exr).
+With --plan coverage, coverage (cumulative fraction) and coverage_gain.
+With --rig, `rig` holds the camera name, reference_camera, relative extrinsics,
+baseline_vector_m and baseline_m to the reference camera.
+With --mask_pass, mask_pixel_counts maps each object name to its visible pixels.
+With --extra_resolutions, `levels` lists each extra size with its rescaled
+intrinsics (resolution, focal_length_px, principal_point_px) and paths.
 
 NOTES
 -----
 * Depth values are in Blender units (meters) from camera plane.
-* Normal pass: camera space normals (Cycles) unless modified.
-* If you need world-space normals, you can add a geometry node & output through compositor.
+* Normal pass: world-space normals, facing the camera (Cycles and --geometry_only).
 * Increase samples for cleaner Cycles images; enable denoising (not yet wired in script).
 * To integrate HDRI lighting, append an environment texture node to the World.
 
 EXTENSIONS (Ideas)
 ------------------
-* Stratified / Fibonacci sphere sampling
+* Stratified / Fibonacci sphere sampling of planning candidates
 * Automatic denoising toggle
 * Multi-object batching
-* Semantic mask pass (object index / cryptomatte)
+* Cryptomatte-based masks for anti-aliased coverage
 
 """
 
@@ -0,0 +1,193 @@
+"""NumPy-only checks for the geometry-only rasterizer and level downsampling.
+
+Runs without Blender: bpy / mathutils are stubbed when they are not importable.
+"""
+
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+try:
+    import bpy  # noqa: F401
+    import mathutils  # noqa: F401
+except ImportError:
+    sys.modules['bpy'] = types.ModuleType('bpy')
+    sys.modules['mathutils'] = types.ModuleType('mathutils')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import multi_view_renderer as mvr  # noqa: E402
+
+W, H = 320, 240
+F = W / 36.0 * 50.0
+INTR = {'focal_length_px': [F, F], 'principal_point_px': [W / 2, H / 2], 'resolution': [W, H]}
+BACKENDS = ['numpy'] + (['numba'] if mvr.numba is not None else [])
+
+
+def cam_at(z):
+    """Camera on +Z looking down -Z (identity rotation)."""
+    m = np.eye(4)
+    m[2, 3] = z
+    return m
+
+
+def look_from(pos):
+    """Camera matrix at `pos` looking at the origin, Y roughly up."""
+    pos = np.asarray(pos, float)
+    fwd = -pos / np.linalg.norm(pos)
+    up = np.array([0.0, 0.0, 1.0]) if abs(fwd[2]) < 0.99 else np.array([0.0, 1.0, 0.0])
+    right = np.cross(fwd, up)
+    right /= np.linalg.norm(right)
+    m = np.eye(4)
+    m[:3, 0], m[:3, 1], m[:3, 2], m[:3, 3] = right, np.cross(right, fwd), -fwd, pos
+    return m
+
+
+def cube():
+    co = np.array([[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)], float)
+    # Outward-wound quads (right-hand rule).
+    quads = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    tris = np.array([t for q in quads for t in ((q[0], q[1], q[2]), (q[0], q[2], q[3]))])
+    return co, tris
+
+
+def uv_sphere(rings=16, segments=32):
+    th = np.linspace(0, np.pi, rings + 1)
+    ph = np.linspace(0, 2 * np.pi, segments + 1)[:-1]
+    co = [[0.0, 0.0, 1.0]]
+    co += [[np.sin(a) * np.cos(b), np.sin(a) * np.sin(b), np.cos(a)] for a in th[1:-1] for b in ph]
+    co.append([0.0, 0.0, -1.0])
+    co = np.array(co)
+    ring = lambda i, j: 1 + i * segments + j % segments  # noqa: E731
+    tris = [(0, ring(0, j), ring(0, j + 1)) for j in range(segments)]
+    for i in range(rings - 2):
+        for j in range(segments):
+            a, b, c, d = ring(i, j), ring(i, j + 1), ring(i + 1, j), ring(i + 1, j + 1)
+            tris += [(a, c, d), (a, d, b)]
+    last = len(co) - 1
+    tris += [(ring(rings - 2, j + 1), ring(rings - 2, j), last) for j in range(segments)]
+    return co, np.array(tris)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_cube_front_face_depth_and_area(backend):
+    co, tris = cube()
+    depth, tri = mvr.rasterize(co, tris, cam_at(5.0), INTR, 0.1, backend=backend)
+    assert depth.shape == (H, W)
+    assert depth[H // 2, W // 2] == pytest.approx(4.0)
+    # Front face at distance 4 spans 2 units -> 2*F/4 pixels per side.
+    expected = (2 * F / 4) ** 2
+    assert abs((tri >= 0).sum() - expected) / expected < 0.01
+    assert np.all(depth[tri < 0] == mvr.BACKGROUND_DEPTH)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_perspective_correct_depth_on_slanted_plane(backend):
+    # Plane z = 0.4x + 0.7y, tilted about both axes; depth along the view axis
+    # at a pixel must match the analytic ray/plane intersection.
+    xy = np.array([[-3, -3], [3, -3], [3, 3], [-3, 3]], float)
+    co = np.column_stack([xy, 0.4 * xy[:, 0] + 0.7 * xy[:, 1]])
+    tris = np.array([[0, 1, 2], [0, 2, 3]])
+    depth, _ = mvr.rasterize(co, tris, cam_at(5.0), INTR, 0.1, backend=backend)
+    for px, py in [(160, 120), (40, 200), (300, 30), (20, 20)]:
+        dx = (px + 0.5 - W / 2) / F
+        dy = (py + 0.5 - H / 2) / F
+        # Ray (dx*t, dy*t, 5 - t) hits the plane at t = 5 / (1 + 0.4*dx + 0.7*dy).
+        assert depth[py, px] == pytest.approx(5.0 / (1.0 + 0.4*dx + 0.7*dy), rel=1e-6)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_sphere_has_no_cracks_and_back_face_culling_is_exact(backend):
+    co, tris = uv_sphere()
+    closed, volume = mvr.mesh_cull_info(tris, co)
+    assert closed and volume > 0
+    for pos in [(0, 0, 3), (2.5, -1.0, 0.7), (-1.2, 0.4, -2.6)]:
+        m = look_from(pos)
+        assert mvr.can_cull_back(closed, volume, co, tris, np.array(pos, float))
+        d_all, t_all = mvr.rasterize(co, tris, m, INTR, 0.1, backend=backend)
+        d_cull, t_cull = mvr.rasterize(co, tris, m, INTR, 0.1, cull_back=True, backend=backend)
+        np.testing.assert_array_equal(t_all >= 0, t_cull >= 0)
+        np.testing.assert_allclose(d_all, d_cull)
+        # Nothing behind the front hemisphere leaks through.
+        fg = d_all < mvr.BACKGROUND_DEPTH
+        assert d_all[fg].max() < np.linalg.norm(pos)
+
+
+def test_cull_refused_for_open_mesh_and_inside_camera():
+    co, tris = cube()
+    closed, volume = mvr.mesh_cull_info(tris, co)
+    assert not mvr.can_cull_back(closed, volume, co, tris, np.zeros(3))
+    assert mvr.can_cull_back(closed, volume, co, tris, np.array([0.0, 0.0, 5.0]))
+    # Inverted cube (builtin:room) seen from inside may be culled.
+    inv = tris[:, ::-1]
+    closed_i, volume_i = mvr.mesh_cull_info(inv, co)
+    assert volume_i < 0
+    assert mvr.can_cull_back(closed_i, volume_i, co, inv, np.zeros(3))
+    assert not mvr.mesh_cull_info(tris[:-1], co)[0]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_open_plane_is_two_sided(backend):
+    co = np.array([[-1, -1, 0], [1, -1, 0], [1, 1, 0], [-1, 1, 0]], float)
+    tris = np.array([[0, 1, 2], [0, 2, 3]])
+    above, _ = mvr.rasterize(co, tris, cam_at(3.0), INTR, 0.1, backend=backend)
+    below, _ = mvr.rasterize(co, tris, look_from((0, 0.01, -3.0)), INTR, 0.1, backend=backend)
+    assert (above < mvr.BACKGROUND_DEPTH).sum() > 0
+    assert (below < mvr.BACKGROUND_DEPTH).sum() > 0
+
+
+def test_fragment_budget_does_not_change_result():
+    co, tris = uv_sphere()
+    m = look_from((0.4, -1.6, 0.3))  # close-up: large triangles
+    d_ref, t_ref = mvr.rasterize(co, tris, m, INTR, 0.1, backend='numpy')
+    d_small, t_small = mvr.rasterize(co, tris, m, INTR, 0.1, backend='numpy', budget=5000)
+    np.testing.assert_array_equal(t_ref, t_small)
+    np.testing.assert_array_equal(d_ref, d_small)
+
+
+@pytest.mark.skipif(mvr.numba is None, reason='numba not installed')
+def test_numba_matches_numpy():
+    co, tris = uv_sphere(24, 48)
+    for pos in [(0, 0, 3), (1.5, -1.5, 0.4)]:
+        d_np, t_np = mvr.rasterize(co, tris, look_from(pos), INTR, 0.1, backend='numpy')
+        d_nb, t_nb = mvr.rasterize(co, tris, look_from(pos), INTR, 0.1, backend='numba')
+        np.testing.assert_array_equal(t_np >= 0, t_nb >= 0)
+        np.testing.assert_allclose(d_np, d_nb, rtol=1e-12)
+
+
+def test_footprint_min_index_keeps_foreground():
+    depth = np.full((4, 4), 10.0)
+    depth[0, 1] = 2.0
+    depth[3, 3] = 1.0
+    pick = mvr.footprint_min_index(depth, 2, 2)
+    np.testing.assert_array_equal(depth.ravel()[pick].reshape(2, 2), [[2.0, 10.0], [10.0, 1.0]])
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_triangles_crossing_near_plane_are_clipped(backend):
+    # A wall whose triangles reach behind the camera still covers the view.
+    co = np.array([[-50, -50, 0], [50, -50, 0], [50, 50, 0], [-50, 50, 0]], float)
+    tris = np.array([[0, 1, 2], [0, 2, 3]])
+    m = look_from((0.3, 0.2, 1.0))
+    depth, tri = mvr.rasterize(co, tris, m, INTR, 0.1, backend=backend)
+    assert (tri >= 0).all()
+    # Center ray hits the plane at the look-at origin.
+    assert depth[H // 2, W // 2] == pytest.approx(np.linalg.norm([0.3, 0.2, 1.0]), rel=1e-3)
+
+
+def test_visible_points_uses_depth_buffer_for_occlusion():
+    co, tris = uv_sphere(24, 48)
+    # A small occluding square between the camera and the sphere's front.
+    sq = np.array([[-0.2, -0.2, 2.0], [0.2, -0.2, 2.0], [0.2, 0.2, 2.0], [-0.2, 0.2, 2.0]])
+    mesh_co = np.vstack([co, sq])
+    mesh_tris = np.vstack([tris, len(co) + np.array([[0, 1, 2], [0, 2, 3]])])
+    mesh = (mesh_co, mesh_tris) + mvr.mesh_cull_info(mesh_tris, mesh_co)
+    points = np.array([[0, 0, 1.0], [0.6, 0, 0.8], [0, 0, -1.0], [0.0, 0.6, 0.8]])
+    normals = points / np.linalg.norm(points, axis=1, keepdims=True)
+    low = {'focal_length_px': [F / 4, F / 4], 'principal_point_px': [W / 8, H / 8],
+           'resolution': [W // 4, H // 4]}
+    seen = mvr.visible_points(points, normals, mesh, cam_at(4.0), low, 0.1)
+    # Behind the square, visible, facing away, visible.
+    np.testing.assert_array_equal(seen, [False, True, False, True])